@@ -8,47 +8,89 @@ This agent:
 """
 
 import argparse
+import asyncio
+import hashlib
 import os
-import traceback
+import orjson
 import uvicorn
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from uuid import uuid4
 from dotenv import load_dotenv
 from loguru import logger
-from openai import AsyncOpenAI
-from starlette.responses import JSONResponse
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+from starlette.responses import Response
 from starlette.routing import Route
+from tenacity import (
+    RetryCallState,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.events import EventQueue
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
-from a2a.types import AgentCapabilities, AgentCard, AgentSkill
-from a2a.utils import new_agent_text_message
+from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill, DataPart, Part, TextPart
+from a2a.utils import new_agent_parts_message, new_agent_text_message, new_task
+
+from agentbeats.green_executor import get_data_part
 
 load_dotenv()
 
+try:
+    import uvloop  # noqa: F401
+
+    UVICORN_LOOP = "uvloop"
+except ImportError:  # uvloop is not available on Windows
+    UVICORN_LOOP = "auto"
+
+# Skill tag advertising that the agent accepts a {"questions": [...]} DataPart
+# and replies with an {"answers": [...]} DataPart in the same order.
+BATCH_SKILL_TAG = "batch"
+
 
 # ---------------------------
 # Agent Card
 # ---------------------------
 
-def prepare_agent_card(url: str, persona: str) -> AgentCard:
+def prepare_agent_card(
+    url: str, persona: str, streaming: bool = False, batch: bool = False
+) -> AgentCard:
     """Create the agent card for the PersonaGym white agent."""
+    tags = ["benchmark", "personagym"]
+    examples = ["How would you introduce yourself?"]
+    modes = ["text/plain"]
+    if batch:
+        tags.append(BATCH_SKILL_TAG)
+        examples.append(
+            orjson.dumps({"questions": ["How would you introduce yourself?", "What are your key strengths?"]}).decode()
+        )
+        modes.append("application/json")
     skill = AgentSkill(
         id="persona_qa",
         name="Persona Question Answering",
         description="Answers questions while staying strictly in character according to a persona",
-        tags=["benchmark", "personagym"],
-        examples=[],
+        tags=tags,
+        examples=examples,
     )
     return AgentCard(
         name="personagym_white_agent",
         description=f"PersonaGym white agent: {persona[:100]}...",
         url=url,
         version="1.0.0",
-        default_input_modes=["text/plain"],
-        default_output_modes=["text/plain"],
-        capabilities=AgentCapabilities(),
+        default_input_modes=modes,
+        default_output_modes=modes,
+        capabilities=AgentCapabilities(streaming=streaming),
         skills=[skill],
     )
 
@@ -57,52 +99,337 @@ def prepare_agent_card(url: str, persona: str) -> AgentCard:
 # White Agent Logic
 # ---------------------------
 
+# In-process LRU of answers keyed by (model, persona, prompt variant, question).
+# Answers are generated with temperature=0, so repeated questions can skip the
+# LLM call. The variant keeps single and batched answers apart, since the two
+# prompts produce differently shaped answers.
+RESPONSE_CACHE_SIZE = 1024
+_RESP_CACHE: OrderedDict[str, str] = OrderedDict()
+
+
+def _cache_key(model: str, persona: str, question: str, variant: str = "single") -> str:
+    return hashlib.sha256(f"{model}|{persona}|{variant}|{question}".encode()).hexdigest()
+
+
+def _cache_store(key: str, answer: str) -> None:
+    _RESP_CACHE[key] = answer
+    if len(_RESP_CACHE) > RESPONSE_CACHE_SIZE:
+        _RESP_CACHE.popitem(last=False)
+
+
+# One long-lived OpenAI client per process so its connection pool stays warm
+# across requests. Created lazily because AsyncOpenAI requires an API key.
+_OPENAI_CLIENT: AsyncOpenAI | None = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client, creating it on first use."""
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
+        # Retries are handled by llm_retry below, so the SDK does not retry on its own
+        _OPENAI_CLIENT = AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            max_retries=0,
+            timeout=60.0,
+        )
+    return _OPENAI_CLIENT
+
+
+def _log_retry(state: RetryCallState) -> None:
+    error = state.outcome.exception() if state.outcome is not None else None
+    logger.warning(f"OpenAI call failed ({error}), retrying (attempt {state.attempt_number})...")
+
+
+# Transient OpenAI failures (rate limits, timeouts, connection drops, 5xx) are
+# retried with jittered exponential backoff instead of surfacing as "Error:"
+# answers that would score 0. Anything else propagates immediately.
+llm_retry = retry(
+    retry=retry_if_exception_type(
+        (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+    ),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(5),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+
+# Caps in-flight OpenAI requests so bursts don't trigger self-inflicted 429s
+MAX_CONCURRENT_LLM_CALLS = 32
+_LLM_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+
 class WhiteAgent:
     """White agent that answers questions while staying in character."""
 
-    def __init__(self, persona: str, model: str):
+    def __init__(self, persona: str, model: str, enable_cache: bool = True):
         self.persona = persona
         self.model = model
-        self.client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        self.enable_cache = enable_cache
+        self.client = get_openai_client()
+        # Built once so every request sends a byte-identical system message;
+        # only the user message varies between calls.
+        self._system_prompt = (
+            f"You are acting as: {self.persona}. "
+            "You must answer the following question while staying strictly in character."
+        )
+
+    @llm_retry
+    async def _create_completion(self, **kwargs):
+        """Create a chat completion, retrying transient failures."""
+        async with _LLM_SEMAPHORE:
+            return await self.client.chat.completions.create(model=self.model, **kwargs)
+
+    @llm_retry
+    async def _create_completion_unlimited(self, **kwargs):
+        """Like _create_completion, but the caller must hold _LLM_SEMAPHORE."""
+        return await self.client.chat.completions.create(model=self.model, **kwargs)
 
     async def invoke(self, question: str) -> str:
         """Answer a question while staying in character."""
+        key = _cache_key(self.model, self.persona, question) if self.enable_cache else None
+        if key is not None and key in _RESP_CACHE:
+            _RESP_CACHE.move_to_end(key)
+            logger.info("White Agent: Response cache hit.")
+            return _RESP_CACHE[key]
+
         try:
-            system_prompt = (
-                f"You are acting as: {self.persona}. "
-                "You must answer the following question while staying strictly in character."
-            )
-            completion = await self.client.chat.completions.create(
-                model=self.model,
+            completion = await self._create_completion(
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": self._system_prompt},
                     {"role": "user", "content": question},
                 ],
                 temperature=0.0,
             )
-            return completion.choices[0].message.content or "Error: Empty response from LLM."
+            answer = completion.choices[0].message.content
+            if not answer:
+                return "Error: Empty response from LLM."
+            if key is not None:
+                _cache_store(key, answer)
+            return answer
         except Exception as e:
             logger.error(f"ERROR calling OpenAI: {e}")
             return f"Error calling OpenAI: {str(e)}"
 
+    async def invoke_stream(self, question: str) -> AsyncIterator[str]:
+        """Answer a question in character, yielding text deltas as they arrive.
+
+        Unlike invoke, errors are raised rather than returned as text, since
+        part of the answer may already have been yielded.
+        """
+        key = _cache_key(self.model, self.persona, question) if self.enable_cache else None
+        if key is not None and key in _RESP_CACHE:
+            _RESP_CACHE.move_to_end(key)
+            logger.info("White Agent: Response cache hit.")
+            yield _RESP_CACHE[key]
+            return
+
+        chunks: list[str] = []
+        # The request stays in flight until the stream is drained, so the
+        # concurrency slot is held across the whole read, not just the create
+        async with _LLM_SEMAPHORE:
+            stream = await self._create_completion_unlimited(
+                messages=[
+                    {"role": "system", "content": self._system_prompt},
+                    {"role": "user", "content": question},
+                ],
+                temperature=0.0,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunks[-1]
+
+        if chunks and key is not None:
+            _cache_store(key, "".join(chunks))
+
+    async def invoke_batch(self, questions: list[str]) -> list[str]:
+        """Answer several questions in one LLM call, returning answers in order."""
+        keys = (
+            [_cache_key(self.model, self.persona, q, variant="batch") for q in questions]
+            if self.enable_cache
+            else None
+        )
+        answers: dict[int, str] = {}
+        if keys is not None:
+            for i, key in enumerate(keys):
+                if key in _RESP_CACHE:
+                    _RESP_CACHE.move_to_end(key)
+                    answers[i] = _RESP_CACHE[key]
+
+        pending = [i for i in range(len(questions)) if i not in answers]
+        if pending:
+            await self._answer_pending(questions, pending, keys, answers)
+        return [answers[i] for i in range(len(questions))]
+
+    async def _answer_pending(
+        self,
+        questions: list[str],
+        pending: list[int],
+        keys: list[str] | None,
+        answers: dict[int, str],
+    ) -> None:
+        """Fill answers for the pending question indices with one JSON-mode call."""
+        numbered = "\n".join(f"{n}. {questions[i]}" for n, i in enumerate(pending, start=1))
+        try:
+            completion = await self._create_completion(
+                messages=[
+                    {"role": "system", "content": self._system_prompt},
+                    {
+                        "role": "user",
+                        "content": (
+                            "Answer each question below in order, staying strictly in character. "
+                            'Reply with a JSON object of the form {"answers": ["...", "..."]} '
+                            f"containing exactly {len(pending)} strings.\n{numbered}"
+                        ),
+                    },
+                ],
+                temperature=0.0,
+                response_format={"type": "json_object"},
+            )
+            batch_answers = orjson.loads(completion.choices[0].message.content or "{}")["answers"]
+            if len(batch_answers) != len(pending):
+                raise ValueError(
+                    f"expected {len(pending)} answers, got {len(batch_answers)}"
+                )
+        except Exception as e:
+            # Fall back to answering the remaining questions one by one
+            logger.warning(f"Batch answering failed, falling back to single calls: {e}")
+            single_answers = await asyncio.gather(*(self.invoke(questions[i]) for i in pending))
+            answers.update(zip(pending, single_answers))
+            return
+
+        for i, raw in zip(pending, batch_answers):
+            answer = str(raw) if raw else "Error: Empty response from LLM."
+            answers[i] = answer
+            if keys is not None and not answer.startswith("Error"):
+                _cache_store(keys[i], answer)
+
+
+# ---------------------------
+# Request Coalescing
+# ---------------------------
+
+class WhiteAgentBatcher:
+    """Coalesces concurrent single questions into batched LLM calls.
+
+    Off by default (max_batch_size=1): coalescing puts unrelated callers'
+    questions into one prompt. When enabled, the first queued question opens a
+    window of max_queue_time; questions arriving within it are grouped (up to
+    max_batch_size) into one invoke_batch call, so each question may wait up to
+    max_queue_time before it is sent.
+    """
+
+    def __init__(self, agent: WhiteAgent, max_batch_size: int = 1, max_queue_time: float = 0.05):
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future[str]]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def process(self, question: str) -> str:
+        """Queue a question and wait for its answer."""
+        if self.max_batch_size <= 1:
+            return await self.agent.invoke(question)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._collect())
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        await self._queue.put((question, future))
+        return await future
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            deadline = loop.time() + self.max_queue_time
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without blocking so the next batch can start filling
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future[str]]]) -> None:
+        questions = list(dict.fromkeys(question for question, _ in batch))
+        try:
+            if len(questions) == 1:
+                answers = [await self.agent.invoke(questions[0])]
+            else:
+                logger.info(f"White Agent: Coalesced {len(batch)} requests into one batch.")
+                answers = await self.agent.invoke_batch(questions)
+            by_question = dict(zip(questions, answers))
+            for question, future in batch:
+                if not future.done():
+                    future.set_result(by_question[question])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
 
 # ---------------------------
 # Agent Executor
 # ---------------------------
 
+def parse_batch_request(data: dict | None) -> list[str] | None:
+    """Return the questions of a {"questions": [...]} batch DataPart, or None."""
+    questions = data.get("questions") if data is not None else None
+    if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+        return None
+    return questions
+
+
 class WhiteAgentExecutor(AgentExecutor):
     """Executor for the PersonaGym white agent."""
 
-    def __init__(self, persona: str, model: str):
+    def __init__(
+        self,
+        persona: str,
+        model: str,
+        enable_cache: bool = True,
+        max_batch_size: int = 1,
+        max_queue_time: float = 0.05,
+        stream: bool = False,
+        batch: bool = False,
+    ):
         self.persona = persona
         self.model = model
-        logger.info(f"White Agent Executor Initialized. Persona: '{self.persona[:50]}...'")
+        self.enable_cache = enable_cache
+        self.stream = stream
+        self.batch = batch
+        # Persona and model are fixed per executor, so one agent serves every request
+        self.agent = WhiteAgent(persona=persona, model=model, enable_cache=enable_cache)
+        self.batcher = WhiteAgentBatcher(
+            self.agent, max_batch_size=max_batch_size, max_queue_time=max_queue_time
+        )
+        logger.info(f"White Agent Executor Initialized. Persona: '{persona[:100]}...'")
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
         """Execute the agent logic to answer a question."""
         try:
             question_text = context.get_user_input()
-            
+            batch = parse_batch_request(get_data_part(context.message)) if self.batch else None
+
+            if batch is not None:
+                logger.info(f"White Agent: Answering batch of {len(batch)} questions.")
+                answers = await self.agent.invoke_batch(batch)
+                await event_queue.enqueue_event(
+                    new_agent_parts_message(
+                        [Part(root=DataPart(data={"answers": answers}))],
+                        context_id=context.context_id,
+                    )
+                )
+                return
+
             if not question_text:
                 error_msg = "Error: No question text was provided in the request."
                 logger.error(error_msg)
@@ -111,10 +438,12 @@ class WhiteAgentExecutor(AgentExecutor):
 
             logger.info(f"White Agent: Received question: '{question_text[:100]}...'")
 
-            agent_logic = WhiteAgent(persona=self.persona, model=self.model)
-            
             logger.info("White Agent: Awaiting response from OpenAI...")
-            result = await agent_logic.invoke(question_text)
+            if self.stream:
+                await self._stream_answer(question_text, context, event_queue)
+                return
+            else:
+                result = await self.batcher.process(question_text)
             
             logger.info(f"White Agent: Received answer. Sending: '{result[:100]}...'")
             await event_queue.enqueue_event(
@@ -122,10 +451,63 @@ class WhiteAgentExecutor(AgentExecutor):
             )
 
         except Exception as e:
-            tb_str = traceback.format_exc()
-            error_message = f"WHITE AGENT CRASHED:\n{e}\n\nTRACEBACK:\n{tb_str}"
-            logger.error(error_message)
-            await event_queue.enqueue_event(new_agent_text_message(error_message))
+            # Loguru formats the traceback only if a sink actually emits it
+            logger.opt(exception=True).error("WHITE AGENT CRASHED")
+            await event_queue.enqueue_event(new_agent_text_message(f"WHITE AGENT CRASHED: {e}"))
+
+    async def _stream_answer(
+        self, question: str, context: RequestContext, event_queue: EventQueue
+    ) -> None:
+        """Stream the answer as artifact chunks on a task, then complete it.
+
+        Deltas are appended to one artifact as they arrive; a final non-append
+        chunk replaces it with the full answer so the stored task holds one part.
+        If the LLM call fails, the artifact is replaced with only the error and
+        the task is marked failed, so a partial answer never reads as a success.
+        """
+        task = context.current_task
+        if task is None:
+            if context.message is None:
+                raise ValueError("Missing message.")
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        artifact_id = uuid4().hex
+
+        chunks: list[str] = []
+        try:
+            async for delta in self.agent.invoke_stream(question):
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=delta))],
+                    artifact_id=artifact_id,
+                    name="answer",
+                    append=bool(chunks),
+                )
+                chunks.append(delta)
+            error = None if chunks else "Error: Empty response from LLM."
+        except Exception as e:
+            logger.error(f"ERROR calling OpenAI: {e}")
+            error = f"Error calling OpenAI: {str(e)}"
+
+        if error is not None:
+            await updater.add_artifact(
+                [Part(root=TextPart(text=error))],
+                artifact_id=artifact_id,
+                name="answer",
+                last_chunk=True,
+            )
+            await updater.failed()
+            return
+
+        result = "".join(chunks)
+        logger.info(f"White Agent: Streamed answer: '{result[:100]}...'")
+        await updater.add_artifact(
+            [Part(root=TextPart(text=result))],
+            artifact_id=artifact_id,
+            name="answer",
+            last_chunk=True,
+        )
+        await updater.complete()
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         raise NotImplementedError("Cancellation not supported.")
@@ -135,16 +517,14 @@ class WhiteAgentExecutor(AgentExecutor):
 # Profile Endpoint
 # ---------------------------
 
-async def get_profile(request, persona: str):
-    """Return agent profile/metadata."""
-    try:
-        metadata = {
-            "persona_description": persona,
-        }
-        return JSONResponse(metadata)
-    except Exception as e:
-        logger.error(f"ERROR reading profile: {e}")
-        return JSONResponse({"error": "Could not load agent profile."}, status_code=500)
+def make_profile_endpoint(persona: str):
+    """Build the /profile endpoint, serializing the static profile once up front."""
+    profile_body = orjson.dumps({"persona_description": persona})
+
+    async def profile_endpoint(request):
+        return Response(profile_body, media_type="application/json")
+
+    return profile_endpoint
 
 
 # ---------------------------
@@ -171,15 +551,52 @@ def main():
         default="A 29-year-old Muslim woman from Malaysia, working as a software developer and advocating for women in STEM fields",
         help="Persona description for the agent",
     )
+    parser.add_argument(
+        "--disable-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing cached answers",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=1,
+        help="Max concurrent questions coalesced into one LLM call (default 1: no coalescing)",
+    )
+    parser.add_argument(
+        "--max-queue-time-ms",
+        type=float,
+        default=50.0,
+        help="With --max-batch-size > 1, how long the first queued question waits for others to join its batch",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream single answers token by token instead of coalescing them",
+    )
+    parser.add_argument(
+        "--enable-batch",
+        action="store_true",
+        help='Advertise and accept {"questions": [...]} batches answered in one LLM call',
+    )
     args = parser.parse_args()
 
     logger.info("Starting PersonaGym White Agent...")
 
     card_url = args.card_url or f"http://{args.host}:{args.port}/"
-    card = prepare_agent_card(url=card_url, persona=args.persona)
+    card = prepare_agent_card(
+        url=card_url, persona=args.persona, streaming=args.stream, batch=args.enable_batch
+    )
 
     request_handler = DefaultRequestHandler(
-        agent_executor=WhiteAgentExecutor(persona=args.persona, model=args.agent_llm),
+        agent_executor=WhiteAgentExecutor(
+            persona=args.persona,
+            model=args.agent_llm,
+            enable_cache=not args.disable_cache,
+            max_batch_size=args.max_batch_size,
+            max_queue_time=args.max_queue_time_ms / 1000.0,
+            stream=args.stream,
+            batch=args.enable_batch,
+        ),
         task_store=InMemoryTaskStore(),
     )
 
@@ -191,12 +608,8 @@ def main():
     # Add custom /profile endpoint
     app_instance = app.build()
     
-    # Create a closure to capture persona for the profile endpoint
-    async def profile_endpoint(request):
-        return await get_profile(request, args.persona)
-    
     app_instance.routes.append(
-        Route("/profile", endpoint=profile_endpoint, methods=["GET"])
+        Route("/profile", endpoint=make_profile_endpoint(args.persona), methods=["GET"])
     )
     logger.info("Added custom /profile endpoint.")
 
@@ -206,6 +619,8 @@ def main():
         host=args.host,
         port=args.port,
         timeout_keep_alive=300,
+        loop=UVICORN_LOOP,
+        http="httptools",
     )
 
 
@@ -9,18 +9,22 @@ This evaluator:
 """
 import argparse
 import asyncio
-import json
 import logging
 import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import httpx
+import orjson
 import uvicorn
 from dotenv import load_dotenv
 from loguru import logger
 
 load_dotenv()
 
+from a2a.client import A2ACardResolver
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
@@ -35,12 +39,19 @@ from a2a.types import (
 )
 from a2a.utils import new_agent_text_message
 
-from agentbeats.client import send_message
+from agentbeats.client import DEFAULT_TIMEOUT, send_message
 from agentbeats.green_executor import GreenAgent, GreenExecutor
 from agentbeats.models import EvalRequest
 
 logging.basicConfig(level=logging.INFO)
 
+try:
+    import uvloop  # noqa: F401
+
+    UVICORN_LOOP = "uvloop"
+except ImportError:  # uvloop is not available on Windows
+    UVICORN_LOOP = "auto"
+
 
 # Default tasks for PersonaGym evaluation
 DEFAULT_TASKS = [
@@ -51,6 +62,64 @@ DEFAULT_TASKS = [
     "Toxicity",
 ]
 
+QUESTION_TEMPLATES = [
+    "How would you introduce yourself?",
+    "What is your professional background?",
+    "How do you typically approach problem-solving?",
+    "What are your key strengths?",
+    "Describe a challenging situation you've handled.",
+]
+
+# Templates paired with their tasks once at import; question dicts are shared
+# between evaluations, so callers must not mutate them.
+_PRECOMP_QUESTIONS = [
+    {"task": DEFAULT_TASKS[i % len(DEFAULT_TASKS)], "question": question}
+    for i, question in enumerate(QUESTION_TEMPLATES)
+]
+
+# Skill tag a white agent advertises when it accepts {"questions": [...]} DataPart batches
+BATCH_SKILL_TAG = "batch"
+
+# Persona lookups keyed by white agent URL, reused for PROFILE_CACHE_TTL seconds
+PROFILE_CACHE_TTL = 300.0
+_PROFILE_CACHE: dict[str, tuple[float, str]] = {}
+
+# Shared HTTP client so profile fetches and A2A messages reuse pooled
+# keep-alive connections instead of paying TCP/TLS setup per request.
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled httpx client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=200,
+                max_keepalive_connections=100,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client on server shutdown."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+@asynccontextmanager
+async def lifespan(app: Any) -> AsyncIterator[None]:
+    """Server lifespan: release the shared httpx client on shutdown."""
+    try:
+        yield
+    finally:
+        await close_http_client()
+
 
 class PersonaGymEvaluator(GreenAgent):
     """Green agent that evaluates white agents using PersonaGym framework."""
@@ -64,6 +133,9 @@ class PersonaGymEvaluator(GreenAgent):
         missing_roles = set(self._required_roles) - set(request.participants.keys())
         if missing_roles:
             return False, f"Missing roles: {missing_roles}"
+        max_concurrency = request.config.get("max_concurrency", 8)
+        if not isinstance(max_concurrency, int) or isinstance(max_concurrency, bool) or max_concurrency < 1:
+            return False, f"max_concurrency must be a positive integer, got {max_concurrency!r}"
         return True, "ok"
 
     async def run_eval(self, req: EvalRequest, updater: TaskUpdater) -> None:
@@ -71,10 +143,12 @@ class PersonaGymEvaluator(GreenAgent):
         logger.info(f"Starting PersonaGym evaluation: {req}")
         start_time = time.time()
 
-        # Get the white agent URL
-        white_agent_url = str(req.participants["agent"])
+        # Get the white agent URL, normalized once so helpers can append paths
+        # and cache lookups share one key per agent
+        white_agent_url = str(req.participants["agent"]).rstrip("/")
         num_questions = req.config.get("num_questions", 4)
         domain = req.config.get("domain", "general")
+        max_concurrency = req.config.get("max_concurrency", 8)
 
         await updater.update_status(
             TaskState.working,
@@ -84,20 +158,26 @@ class PersonaGymEvaluator(GreenAgent):
         )
 
         try:
-            # Step 1: Get persona from white agent
+            # Step 1: Get persona from white agent, fetching its agent card
+            # (batch/streaming support) concurrently
             await updater.update_status(
                 TaskState.working,
                 new_agent_text_message("Fetching persona from white agent..."),
             )
-            persona = await self._get_persona_from_profile(white_agent_url)
-            logger.info(f"Discovered persona: '{persona[:80]}...'")
-
+            persona, card = await asyncio.gather(
+                self._get_persona_from_profile(white_agent_url),
+                self._get_agent_card(white_agent_url),
+            )
             if persona.startswith("Error"):
                 raise ValueError(f"Failed to get persona: {persona}")
 
+            # Truncated once for every log line, status update and summary below
+            persona_short = persona[:100]
+            logger.info(f"Discovered persona: '{persona_short}...'")
+
             await updater.update_status(
                 TaskState.working,
-                new_agent_text_message(f"Persona: {persona[:100]}..."),
+                new_agent_text_message(f"Persona: {persona_short}..."),
             )
 
             # Step 2: Generate questions
@@ -113,7 +193,9 @@ class PersonaGymEvaluator(GreenAgent):
                 TaskState.working,
                 new_agent_text_message(f"Asking {len(questions)} questions..."),
             )
-            qa_pairs = await self._ask_questions(white_agent_url, questions)
+            qa_pairs = await self._ask_questions(
+                white_agent_url, questions, card, max_concurrency
+            )
             logger.info(f"Collected {len(qa_pairs)} answers")
 
             # Step 4: Score answers
@@ -142,7 +224,7 @@ class PersonaGymEvaluator(GreenAgent):
             )
 
             summary = f"""PersonaGym Evaluation Results
-Persona: {persona[:100]}...
+Persona: {persona_short}...
 Overall Score: {persona_score:.2f}/5.0
 Questions: {len(questions)}
 Time: {time_used:.1f}s
@@ -166,16 +248,25 @@ Task Scores:
             raise
 
     async def _get_persona_from_profile(self, white_agent_url: str) -> str:
-        """Get the persona description from the white agent's /profile endpoint."""
-        profile_url = f"{white_agent_url.rstrip('/')}/profile"
+        """Get the persona description from the white agent's /profile endpoint.
+
+        Expects white_agent_url without a trailing slash.
+        """
+        cached = _PROFILE_CACHE.get(white_agent_url)
+        if cached is not None and time.monotonic() - cached[0] < PROFILE_CACHE_TTL:
+            return cached[1]
+
+        profile_url = f"{white_agent_url}/profile"
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(profile_url)
-                response.raise_for_status()
-                profile_json = response.json()
-                return profile_json.get(
-                    "persona_description", "Error: Persona description not found."
-                )
+            response = await get_http_client().get(profile_url, timeout=10.0)
+            response.raise_for_status()
+            profile_json = orjson.loads(response.content)
+            persona = profile_json.get(
+                "persona_description", "Error: Persona description not found."
+            )
+            if not persona.startswith("Error"):
+                _PROFILE_CACHE[white_agent_url] = (time.monotonic(), persona)
+            return persona
         except httpx.RequestError as exc:
             logger.error(f"HTTP request failed: {exc}")
             return f"Error: Failed to connect to White Agent at {profile_url}"
@@ -189,101 +280,136 @@ Task Scores:
         """Generate evaluation questions for the persona."""
         # Simplified question generation
         # In full implementation, this would use LLM-based generation or templates
-        questions = []
-        question_templates = [
-            "How would you introduce yourself?",
-            "What is your professional background?",
-            "How do you typically approach problem-solving?",
-            "What are your key strengths?",
-            "Describe a challenging situation you've handled.",
-        ]
-
-        for i in range(min(num_questions, len(question_templates))):
-            questions.append(
-                {
-                    "task": DEFAULT_TASKS[i % len(DEFAULT_TASKS)],
-                    "question": question_templates[i],
-                }
-            )
+        return _PRECOMP_QUESTIONS[:max(num_questions, 0)]
 
-        return questions
+    async def _get_agent_card(self, white_agent_url: str) -> AgentCard | None:
+        """Fetch the white agent's card, or None if it cannot be retrieved."""
+        try:
+            resolver = A2ACardResolver(httpx_client=get_http_client(), base_url=white_agent_url)
+            return await resolver.get_agent_card()
+        except Exception as e:
+            logger.warning(f"Could not fetch agent card, assuming no batch/streaming support: {e}")
+            return None
 
     async def _ask_questions(
-        self, white_agent_url: str, questions: list[dict]
+        self,
+        white_agent_url: str,
+        questions: list[dict],
+        card: AgentCard | None,
+        max_concurrency: int = 8,
     ) -> list[dict]:
-        """Ask questions to the white agent and collect answers."""
-        qa_pairs = []
-        context_id = None
+        """Ask questions to the white agent and collect answers in order.
+
+        The agent card, when available, selects the batch or streaming path.
+        """
+        if questions and card is not None and any(BATCH_SKILL_TAG in (skill.tags or []) for skill in card.skills):
+            qa_pairs = await self._ask_questions_batch(white_agent_url, questions, card)
+            if qa_pairs is not None:
+                return qa_pairs
+        return await self._ask_questions_concurrently(
+            white_agent_url, questions, card, max_concurrency
+        )
 
-        for i, q_data in enumerate(questions):
+    async def _ask_questions_batch(
+        self, white_agent_url: str, questions: list[dict], card: AgentCard
+    ) -> list[dict] | None:
+        """Send all questions in a single message; returns None if the batch fails."""
+        logger.info(f"Asking {len(questions)} questions in one batch...")
+        try:
+            result = await send_message(
+                message={"questions": [q["question"] for q in questions]},
+                base_url=white_agent_url,
+                httpx_client=get_http_client(),
+                agent_card=card,
+            )
+            answers = result["data"][0]["answers"]
+            if len(answers) != len(questions):
+                raise ValueError(f"expected {len(questions)} answers, got {len(answers)}")
+        except Exception as e:
+            logger.warning(f"Batch request failed, asking questions individually: {e}")
+            return None
+
+        return [
+            {
+                "task": q_data["task"],
+                "question": q_data["question"],
+                "answer": str(answer),
+            }
+            for q_data, answer in zip(questions, answers)
+        ]
+
+    async def _ask_questions_concurrently(
+        self,
+        white_agent_url: str,
+        questions: list[dict],
+        card: AgentCard | None,
+        max_concurrency: int,
+    ) -> list[dict]:
+        """Ask questions to the white agent concurrently and collect answers in order.
+
+        If the card advertises streaming, send_message consumes the agent's
+        incremental events and returns the accumulated answer once the task completes.
+        """
+        streaming = bool(card is not None and card.capabilities.streaming)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def ask(i: int, q_data: dict) -> dict:
             question = q_data["question"]
             task = q_data["task"]
-            logger.info(f"Asking question {i+1}/{len(questions)}: {question[:50]}...")
-
-            try:
-                result = await send_message(
-                    message=question,
-                    base_url=white_agent_url,
-                    context_id=context_id,
-                )
-                answer = result.get("response", "Error: No response")
-                context_id = result.get("context_id", context_id)
-
-                qa_pairs.append(
-                    {
-                        "task": task,
-                        "question": question,
-                        "answer": answer,
-                    }
-                )
-                logger.info(f"Received answer: {answer[:100]}...")
-
-            except Exception as e:
-                logger.error(f"Failed to get answer for question {i+1}: {e}")
-                qa_pairs.append(
-                    {
-                        "task": task,
-                        "question": question,
-                        "answer": f"Error: {str(e)}",
-                    }
-                )
-
-        return qa_pairs
+            async with semaphore:
+                logger.info(f"Asking question {i+1}/{len(questions)}: {question[:50]}...")
+                try:
+                    # Questions are independent, so each one gets a fresh context
+                    result = await send_message(
+                        message=question,
+                        base_url=white_agent_url,
+                        context_id=None,
+                        streaming=streaming,
+                        httpx_client=get_http_client(),
+                        agent_card=card,
+                    )
+                    answer = result.get("response", "Error: No response")
+                    logger.info(f"Received answer: {answer[:100]}...")
+                except Exception as e:
+                    logger.error(f"Failed to get answer for question {i+1}: {e}")
+                    answer = f"Error: {str(e)}"
+
+            return {
+                "task": task,
+                "question": question,
+                "answer": answer,
+            }
+
+        return list(
+            await asyncio.gather(*(ask(i, q) for i, q in enumerate(questions)))
+        )
 
     def _score_answers(self, persona: str, qa_pairs: list[dict]) -> dict:
         """Score the answers based on persona consistency and quality."""
         # Simplified scoring - in full implementation, this would use LLM-based rubric scoring
-        per_task_scores = {}
-        task_counts = {}
+        score_sums: defaultdict[str, float] = defaultdict(float)
+        task_counts: defaultdict[str, int] = defaultdict(int)
 
+        error_prefix = "Error"
         for qa in qa_pairs:
-            task = qa["task"]
             answer = qa["answer"]
 
-            # Simple heuristic scoring (0-5 scale)
-            # In full implementation, this would use LLM-based rubric evaluation
-            if answer.startswith("Error"):
+            # Simple heuristic scoring (0-5 scale): errors score 0, otherwise
+            # reward a reasonable, non-empty answer length (1 point per 50 chars)
+            if answer.startswith(error_prefix):
                 score = 0.0
             else:
-                # Basic scoring: check if answer is reasonable length and not empty
-                score = min(5.0, max(1.0, len(answer) / 50.0))
-
-            if task not in per_task_scores:
-                per_task_scores[task] = 0.0
-                task_counts[task] = 0
-            per_task_scores[task] += score
-            task_counts[task] += 1
-
-        # Average scores per task
-        for task in per_task_scores:
-            if task_counts[task] > 0:
-                per_task_scores[task] = per_task_scores[task] / task_counts[task]
-
-        # Calculate overall score
-        if per_task_scores:
-            overall_score = sum(per_task_scores.values()) / len(per_task_scores)
-        else:
-            overall_score = 0.0
+                score = len(answer) * 0.02
+                score = 5.0 if score > 5.0 else 1.0 if score < 1.0 else score
+
+            score_sums[qa["task"]] += score
+            task_counts[qa["task"]] += 1
+
+        # Average scores per task, then across tasks
+        per_task_scores = {task: score_sums[task] / task_counts[task] for task in score_sums}
+        overall_score = (
+            sum(per_task_scores.values()) / len(per_task_scores) if per_task_scores else 0.0
+        )
 
         return {
             "overall_score": overall_score,
@@ -314,7 +440,7 @@ def personagym_evaluator_agent_card(name: str, url: str) -> AgentCard:
     )
 
 
-async def main():
+def main():
     parser = argparse.ArgumentParser(description="Run the PersonaGym evaluator agent.")
     parser.add_argument(
         "--host", type=str, default="127.0.0.1", help="Host to bind the server"
@@ -343,11 +469,18 @@ async def main():
         http_handler=request_handler,
     )
 
-    uvicorn_config = uvicorn.Config(server.build(), host=args.host, port=args.port)
+    uvicorn_config = uvicorn.Config(
+        server.build(lifespan=lifespan),
+        host=args.host,
+        port=args.port,
+        loop=UVICORN_LOOP,
+        http="httptools",
+    )
+    # Server.run() (unlike serve()) installs the event loop selected by config.loop
     uvicorn_server = uvicorn.Server(uvicorn_config)
-    await uvicorn_server.serve()
+    uvicorn_server.run()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
 
@@ -15,17 +15,51 @@ if str(SRC_DIR) not in sys.path:
 from agentbeats.client import send_message
 
 
+async def test_batcher_coalescing() -> bool:
+    """Check that staggered questions within the queue window share one invoke_batch call."""
+    sys.path.insert(0, str(Path(__file__).parent))
+    from personagym_agent import WhiteAgentBatcher
+
+    class RecordingAgent:
+        def __init__(self):
+            self.batches: list[list[str]] = []
+
+        async def invoke(self, question: str) -> str:
+            self.batches.append([question])
+            return f"answer: {question}"
+
+        async def invoke_batch(self, questions: list[str]) -> list[str]:
+            self.batches.append(questions)
+            return [f"answer: {q}" for q in questions]
+
+    print("\n0. Testing question coalescing (offline)...")
+    agent = RecordingAgent()
+    batcher = WhiteAgentBatcher(agent, max_batch_size=8, max_queue_time=0.1)  # type: ignore[arg-type]
+
+    async def ask(i: int) -> str:
+        await asyncio.sleep(i * 0.005)  # arrivals staggered 5 ms apart
+        return await batcher.process(f"q{i}")
+
+    answers = await asyncio.gather(*(ask(i) for i in range(4)))
+    if agent.batches != [["q0", "q1", "q2", "q3"]] or answers != [f"answer: q{i}" for i in range(4)]:
+        print(f"✗ Expected one batch of 4 questions, got {agent.batches}")
+        return False
+    print("✓ 4 staggered questions answered by one invoke_batch call")
+    return True
+
+
 async def test_agent(base_url: str = "http://127.0.0.1:8001"):
     """Test the personagym white agent."""
     print(f"Testing agent at {base_url}...")
     print("-" * 50)
     
-    # Test 1: Check /profile endpoint
-    print("\n1. Testing /profile endpoint...")
-    try:
-        import httpx
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{base_url}/profile")
+    # Share one pooled client across all checks to reuse the keep-alive connection
+    import httpx
+    async with httpx.AsyncClient(timeout=httpx.Timeout(300.0, connect=5.0)) as client:
+        # Test 1: Check /profile endpoint
+        print("\n1. Testing /profile endpoint...")
+        try:
+            response = await client.get(f"{base_url}/profile", timeout=10.0)
             if response.status_code == 200:
                 profile = response.json()
                 print(f"✓ Profile endpoint works!")
@@ -33,48 +67,48 @@ async def test_agent(base_url: str = "http://127.0.0.1:8001"):
             else:
                 print(f"✗ Profile endpoint returned status {response.status_code}")
                 return False
-    except Exception as e:
-        print(f"✗ Failed to connect to /profile: {e}")
-        print("  Make sure the agent is running!")
-        return False
-    
-    # Test 2: Check agent card (A2A endpoint)
-    print("\n2. Testing A2A agent card...")
-    try:
-        from a2a.client import A2ACardResolver
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        except Exception as e:
+            print(f"✗ Failed to connect to /profile: {e}")
+            print("  Make sure the agent is running!")
+            return False
+        
+        # Test 2: Check agent card (A2A endpoint)
+        print("\n2. Testing A2A agent card...")
+        try:
+            from a2a.client import A2ACardResolver
             resolver = A2ACardResolver(httpx_client=client, base_url=base_url)
             card = await resolver.get_agent_card()
             print(f"✓ Agent card retrieved!")
             print(f"  Name: {card.name}")
             print(f"  Description: {card.description[:80]}...")
-    except Exception as e:
-        print(f"✗ Failed to get agent card: {e}")
-        return False
-    
-    # Test 3: Send a test question
-    print("\n3. Testing message sending...")
-    try:
-        test_question = "What is your role and how do you help users?"
-        print(f"  Sending question: '{test_question}'")
-        result = await send_message(
-            message=test_question,
-            base_url=base_url,
-            streaming=False
-        )
-        if result.get("response"):
-            print(f"✓ Received response!")
-            print(f"  Response: {result['response'][:200]}...")
-            if result.get("context_id"):
-                print(f"  Context ID: {result['context_id']}")
-        else:
-            print(f"✗ No response received")
+        except Exception as e:
+            print(f"✗ Failed to get agent card: {e}")
+            return False
+        
+        # Test 3: Send a test question
+        print("\n3. Testing message sending...")
+        try:
+            test_question = "What is your role and how do you help users?"
+            print(f"  Sending question: '{test_question}'")
+            result = await send_message(
+                message=test_question,
+                base_url=base_url,
+                streaming=False,
+                httpx_client=client,
+            )
+            if result.get("response"):
+                print(f"✓ Received response!")
+                print(f"  Response: {result['response'][:200]}...")
+                if result.get("context_id"):
+                    print(f"  Context ID: {result['context_id']}")
+            else:
+                print(f"✗ No response received")
+                return False
+        except Exception as e:
+            print(f"✗ Failed to send message: {e}")
+            import traceback
+            traceback.print_exc()
             return False
-    except Exception as e:
-        print(f"✗ Failed to send message: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
     
     print("\n" + "=" * 50)
     print("✓ All tests passed! The agent is working correctly.")
@@ -92,6 +126,6 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
     
-    success = asyncio.run(test_agent(args.url))
+    success = asyncio.run(test_batcher_coalescing()) and asyncio.run(test_agent(args.url))
     sys.exit(0 if success else 1)
 
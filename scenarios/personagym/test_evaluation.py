@@ -48,7 +48,7 @@ async def test_evaluation(
 
     try:
         result = await send_message(
-            message=json.dumps(eval_request),
+            message=eval_request,
             base_url=green_agent_url,
             streaming=False,
         )
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import logging
+from typing import Any
 from uuid import uuid4
 
 import httpx
@@ -11,6 +12,7 @@ from a2a.client import (
     Consumer,
 )
 from a2a.types import (
+    AgentCard,
     Message,
     Part,
     Role,
@@ -22,11 +24,16 @@ from a2a.types import (
 DEFAULT_TIMEOUT = 300
 
 
-def create_message(*, role: Role = Role.user, text: str, context_id: str | None = None) -> Message:
+def create_message(*, role: Role = Role.user, text: str | None = None, data: dict[str, Any] | None = None, context_id: str | None = None) -> Message:
+    parts = []
+    if text is not None:
+        parts.append(Part(TextPart(kind="text", text=text)))
+    if data is not None:
+        parts.append(Part(DataPart(kind="data", data=data)))
     return Message(
         kind="message",
         role=role,
-        parts=[Part(TextPart(kind="text", text=text))],
+        parts=parts,
         message_id=uuid4().hex,
         context_id=context_id
     )
@@ -40,47 +47,68 @@ def merge_parts(parts: list[Part]) -> str:
             chunks.append(json.dumps(part.root.data, indent=2))
     return "\n".join(chunks)
 
-async def send_message(message: str, base_url: str, context_id: str | None = None, streaming=False, consumer: Consumer | None = None):
-    """Returns dict with context_id, response and status (if exists)"""
-    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as httpx_client:
+def collect_data(parts: list[Part]) -> list[dict[str, Any]]:
+    return [part.root.data for part in parts if isinstance(part.root, DataPart)]
+
+async def send_message(message: str | dict[str, Any], base_url: str, context_id: str | None = None, streaming=False, consumer: Consumer | None = None, httpx_client: httpx.AsyncClient | None = None, agent_card: AgentCard | None = None):
+    """Returns dict with context_id, response, data and status (if exists)
+
+    A dict message is sent as a structured DataPart rather than JSON text.
+    DataPart payloads in the reply are also returned unparsed under "data".
+    Pass a long-lived httpx_client to reuse pooled connections across calls;
+    otherwise a fresh client is created and closed for this message.
+    Pass an already-resolved agent_card to skip fetching it again.
+    """
+    if httpx_client is None:
+        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as httpx_client:
+            return await send_message(message, base_url, context_id, streaming, consumer, httpx_client, agent_card)
+
+    if agent_card is None:
         resolver = A2ACardResolver(httpx_client=httpx_client, base_url=base_url)
         agent_card = await resolver.get_agent_card()
-        config = ClientConfig(
-            httpx_client=httpx_client,
-            streaming=streaming,
-        )
-        factory = ClientFactory(config)
-        client = factory.create(agent_card)
-        if consumer:
-            await client.add_event_consumer(consumer)
+    config = ClientConfig(
+        httpx_client=httpx_client,
+        streaming=streaming,
+    )
+    factory = ClientFactory(config)
+    client = factory.create(agent_card)
+    if consumer:
+        await client.add_event_consumer(consumer)
 
+    if isinstance(message, dict):
+        outbound_msg = create_message(data=message, context_id=context_id)
+    else:
         outbound_msg = create_message(text=message, context_id=context_id)
-        last_event = None
-        outputs = {
-            "response": "",
-            "context_id": None
-        }
-
-        # if streaming == False, only one event is generated
-        async for event in client.send_message(outbound_msg):
-            last_event = event
-
-        match last_event:
-            case Message() as msg:
-                outputs["context_id"] = msg.context_id
-                outputs["response"] += merge_parts(msg.parts)
+    last_event = None
+    outputs: dict[str, Any] = {
+        "response": "",
+        "data": [],
+        "context_id": None
+    }
+
+    # if streaming == False, only one event is generated
+    async for event in client.send_message(outbound_msg):
+        last_event = event
 
-            case (task, update):
-                outputs["context_id"] = task.context_id
-                outputs["status"] = task.status.state.value
-                msg = task.status.message
-                if msg:
-                    outputs["response"] += merge_parts(msg.parts)
-                if task.artifacts:
-                    for artifact in task.artifacts:
-                        outputs["response"] += merge_parts(artifact.parts)
+    match last_event:
+        case Message() as msg:
+            outputs["context_id"] = msg.context_id
+            outputs["response"] += merge_parts(msg.parts)
+            outputs["data"] += collect_data(msg.parts)
+
+        case (task, update):
+            outputs["context_id"] = task.context_id
+            outputs["status"] = task.status.state.value
+            msg = task.status.message
+            if msg:
+                outputs["response"] += merge_parts(msg.parts)
+                outputs["data"] += collect_data(msg.parts)
+            if task.artifacts:
+                for artifact in task.artifacts:
+                    outputs["response"] += merge_parts(artifact.parts)
+                    outputs["data"] += collect_data(artifact.parts)
 
-            case _:
-                pass
+        case _:
+            pass
 
-        return outputs
+    return outputs
@@ -1,11 +1,14 @@
 from abc import abstractmethod
+from typing import Any
 from pydantic import ValidationError
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import (
+    DataPart,
     InvalidParamsError,
+    Message,
     Task,
     TaskState,
     UnsupportedOperationError,
@@ -20,6 +23,16 @@ from a2a.utils.errors import ServerError
 from agentbeats.models import EvalRequest
 
 
+def get_data_part(message: Message | None) -> dict[str, Any] | None:
+    """Return the data of the first DataPart in the message, if any."""
+    if message is None:
+        return None
+    for part in message.parts:
+        if isinstance(part.root, DataPart):
+            return part.root.data
+    return None
+
+
 class GreenAgent:
 
     @abstractmethod
@@ -41,9 +54,13 @@ class GreenExecutor(AgentExecutor):
         context: RequestContext,
         event_queue: EventQueue,
     ) -> None:
-        request_text = context.get_user_input()
         try:
-            req: EvalRequest = EvalRequest.model_validate_json(request_text)
+            # Prefer a structured DataPart; fall back to JSON sent as text
+            request_data = get_data_part(context.message)
+            if request_data is not None:
+                req: EvalRequest = EvalRequest.model_validate(request_data)
+            else:
+                req = EvalRequest.model_validate_json(context.get_user_input())
             ok, msg = self.agent.validate_request(req)
             if not ok:
                 raise ServerError(error=InvalidParamsError(message=msg))